@@ -22,9 +22,11 @@
 
 import asyncio
 import json
-from typing import Any, Dict, Optional, Union, cast
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union, cast
 
 import aiohttp
+import orjson  # type: ignore
 from aea.configurations.base import PublicId
 from aea.connections.base import Connection, ConnectionStates
 from aea.mail.base import Envelope
@@ -39,6 +41,53 @@ from packages.valory.protocols.srr.message import SrrMessage
 
 PUBLIC_ID = PublicId.from_str("dvilela/mirror_db:0.1.0")
 
+# HTTP client tuning: all requests go to a single backend, so keep a warm
+# per-host keep-alive pool and cache DNS lookups
+CONNECTOR_LIMIT = 64
+CONNECTOR_LIMIT_PER_HOST = 32
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 30
+REQUEST_TOTAL_TIMEOUT = 30
+REQUEST_CONNECT_TIMEOUT = 5
+JSON_CONTENT_TYPE = "application/json"
+# Maximum number of concurrent requests to the backend
+NUM_WORKERS = 8
+# Responses to GET requests are reused for a short time
+READ_CACHE_TTL = 30.0
+READ_CACHE_SIZE = 512
+
+# Methods that can be called through SRR requests
+AVAILABLE_METHODS = (
+    "create_agent",
+    "read_agent",
+    "create_twitter_account",
+    "get_twitter_account",
+    "create_tweet",
+    "read_tweet",
+    "create_interaction",
+    "update_api_key",
+    "update_agent_id",
+    "update_twitter_user_id",
+)
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """Deserialize JSON with orjson"""
+    return orjson.loads(data)
+
+
+def json_dumps_bytes(data: Any) -> bytes:
+    """Serialize to compact UTF-8 encoded JSON with orjson"""
+    try:
+        return orjson.dumps(data)
+    except TypeError:  # e.g. integers that do not fit in 64 bits
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def json_dumps(data: Any) -> str:
+    """Serialize to compact JSON with orjson"""
+    return json_dumps_bytes(data).decode()
+
 
 class SrrDialogues(BaseSrrDialogues):
     """A class to keep track of SRR dialogues."""
@@ -81,14 +130,24 @@ class MirrorDBConnection(Connection):
         self.api_key: Optional[str] = None
         self.agent_id: Optional[str] = None
         self.twitter_user_id: Optional[str] = None
+        self._headers: Dict[str, str] = {"content-type": JSON_CONTENT_TYPE}
+        self._agents_url = f"{self.base_url}/api/agents"
+        self._twitter_accounts_url = f"{self.base_url}/api/twitter_accounts"
+        self._tweets_url = f"{self.base_url}/api/tweets"
         self.session: Optional[aiohttp.ClientSession] = None
         self.dialogues = SrrDialogues(connection_id=PUBLIC_ID)
         self._response_envelopes: Optional[asyncio.Queue] = None
-        self.task_to_request: Dict[asyncio.Future, Envelope] = {}
+        self._request_queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._read_cache: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        self._rpc_methods: Dict[str, Callable[..., Awaitable[Any]]] = {
+            name: getattr(self, name) for name in AVAILABLE_METHODS
+        }
 
     async def update_api_key(self, api_key: str) -> None:
         """Update the API key."""
         self.api_key = api_key
+        self._headers = {"access-token": api_key, "content-type": JSON_CONTENT_TYPE}
 
     async def update_agent_id(self, agent_id: str) -> None:
         """Update the agent ID."""
@@ -110,7 +169,23 @@ class MirrorDBConnection(Connection):
     async def connect(self) -> None:
         """Connect to the backend service."""
         self._response_envelopes = asyncio.Queue()
-        self.session = aiohttp.ClientSession()
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=CONNECTOR_LIMIT,
+                limit_per_host=CONNECTOR_LIMIT_PER_HOST,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+                enable_cleanup_closed=True,
+            ),
+            timeout=aiohttp.ClientTimeout(
+                total=REQUEST_TOTAL_TIMEOUT, connect=REQUEST_CONNECT_TIMEOUT
+            ),
+            cookie_jar=aiohttp.DummyCookieJar(),
+        )
+        self._request_queue = asyncio.Queue()
+        self._workers = [
+            self.loop.create_task(self._worker()) for _ in range(NUM_WORKERS)
+        ]
         self.state = ConnectionStates.connected
 
     async def disconnect(self) -> None:
@@ -120,9 +195,11 @@ class MirrorDBConnection(Connection):
 
         self.state = ConnectionStates.disconnecting
 
-        for task in self.task_to_request.keys():
-            if not task.cancelled():
-                task.cancel()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._request_queue = None
         self._response_envelopes = None
 
         if self.session is not None:
@@ -139,16 +216,39 @@ class MirrorDBConnection(Connection):
 
     async def send(self, envelope: Envelope) -> None:
         """Send an envelope."""
-        task = self._handle_envelope(envelope)
-        task.add_done_callback(self._handle_done_task)
-        self.task_to_request[task] = envelope
-
-    def _handle_envelope(self, envelope: Envelope) -> asyncio.Task:
-        """Handle incoming envelopes by dispatching background tasks."""
+        if self._request_queue is None:
+            raise ValueError(
+                "`MirrorDBConnection` request queue is not yet initialized. Is the connection setup?"
+            )
+        dialogue = self.dialogues.update(cast(SrrMessage, envelope.message))
+        await self._request_queue.put((envelope, dialogue))
+
+    async def _worker(self) -> None:
+        """Handle queued envelopes until cancelled."""
+        request_queue = cast(asyncio.Queue, self._request_queue)
+        while True:
+            envelope, dialogue = await request_queue.get()
+            try:
+                await self._handle_envelope(envelope, dialogue)
+            except Exception as e:  # pylint: disable=broad-except
+                self.logger.error("Error while handling a MirrorDB request: %s", e)
+            finally:
+                request_queue.task_done()
+
+    async def _handle_envelope(
+        self, envelope: Envelope, dialogue: Optional[BaseDialogue]
+    ) -> None:
+        """Call the backend service and queue the response envelope."""
         message = cast(SrrMessage, envelope.message)
-        dialogue = self.dialogues.update(message)
-        task = self.loop.create_task(self._get_response(message, dialogue))
-        return task
+        response_message = await self._get_response(message, dialogue)
+        self.response_envelopes.put_nowait(
+            Envelope(
+                to=envelope.sender,
+                sender=envelope.to,
+                message=response_message,
+                context=envelope.context,
+            )
+        )
 
     def prepare_error_message(
         self, srr_message: SrrMessage, dialogue: Optional[BaseDialogue], error: str
@@ -165,22 +265,6 @@ class MirrorDBConnection(Connection):
         )
         return response_message
 
-    def _handle_done_task(self, task: asyncio.Future) -> None:
-        """Process a done receiving task."""
-        request = self.task_to_request.pop(task)
-        response_message: Optional[Message] = task.result()
-
-        response_envelope = None
-        if response_message is not None:
-            response_envelope = Envelope(
-                to=request.sender,
-                sender=request.to,
-                message=response_message,
-                context=request.context,
-            )
-
-        self.response_envelopes.put_nowait(response_envelope)
-
     async def _get_response(
         self, srr_message: SrrMessage, dialogue: Optional[BaseDialogue]
     ) -> SrrMessage:
@@ -192,9 +276,9 @@ class MirrorDBConnection(Connection):
                 f"Performative `{srr_message.performative.value}` is not supported.",
             )
 
-        payload = json.loads(srr_message.payload)
+        payload = json_loads(srr_message.payload)
         method_name = payload.get("method")
-        method = getattr(self, method_name, None)
+        method = self._rpc_methods.get(method_name)
 
         if method is None:
             return self.prepare_error_message(
@@ -210,7 +294,7 @@ class MirrorDBConnection(Connection):
                 dialogue.reply(  # type: ignore
                     performative=SrrMessage.Performative.RESPONSE,
                     target_message=srr_message,
-                    payload=json.dumps({"response": response}),
+                    payload=json_dumps({"response": response}),
                     error=False,
                 ),
             )
@@ -221,14 +305,44 @@ class MirrorDBConnection(Connection):
                 srr_message, dialogue, f"Exception while calling backend service:\n{e}"
             )
 
-    async def create_agent(self, agent_data: Dict) -> Dict:
-        """Create an agent and a Twitter account."""
+    async def _post_json(
+        self, url: str, payload: Dict, headers: Optional[Dict[str, str]] = None
+    ) -> Any:
+        """POST a JSON payload to the backend and decode the JSON response."""
         async with self.session.post(  # type: ignore
-            f"{self.base_url}/api/agents/",
-            json=agent_data,
-            headers={"access-token": f"{self.api_key}"},
+            url, data=json_dumps_bytes(payload), headers=headers or self._headers
         ) as response:
-            agent_response = await response.json()
+            response.raise_for_status()
+            return json_loads(await response.read())
+
+    async def _get_json(self, url: str) -> Any:
+        """GET a resource from the backend and decode the JSON response."""
+        now = self.loop.time()
+        cached = self._read_cache.get(url)
+        if cached is not None and now - cached[0] < READ_CACHE_TTL:
+            self._read_cache.move_to_end(url)
+            return cached[1]
+
+        async with self.session.get(  # type: ignore
+            url, headers=self._headers
+        ) as response:
+            response.raise_for_status()
+            result = json_loads(await response.read())
+
+        self._read_cache[url] = (now, result)
+        self._read_cache.move_to_end(url)
+        if len(self._read_cache) > READ_CACHE_SIZE:
+            self._read_cache.popitem(last=False)
+        return result
+
+    def _invalidate_reads(self, *urls: str) -> None:
+        """Drop cached GET responses that a write may have made stale."""
+        for url in urls:
+            self._read_cache.pop(url, None)
+
+    async def create_agent(self, agent_data: Dict) -> Dict:
+        """Create an agent and a Twitter account."""
+        agent_response = await self._post_json(f"{self._agents_url}/", agent_data)
 
         agent_id = agent_response.get("agent_id")
         if agent_id is None:
@@ -238,56 +352,56 @@ class MirrorDBConnection(Connection):
 
     async def read_agent(self, agent_id: str) -> Dict:
         """Read an agent."""
-        async with self.session.get(  # type: ignore
-            f"{self.base_url}/api/agents/{agent_id}",
-            headers={"access-token": f"{self.api_key}"},
-        ) as response:
-            return await response.json()
+        return await self._get_json(f"{self._agents_url}/{agent_id}")
 
     async def create_twitter_account(self, agent_id: str, account_data: Dict) -> Dict:
         """Create a Twitter account."""
-        api_key = account_data.get("api_key", self.api_key)
-        async with self.session.post(  # type: ignore
-            f"{self.base_url}/api/agents/{agent_id}/twitter_accounts/",
-            json=account_data,
-            headers={"access-token": f"{api_key}"},
-        ) as response:
-            return await response.json()
+        api_key = account_data.get("api_key")
+        headers = (
+            None
+            if api_key is None
+            else {"access-token": api_key, "content-type": JSON_CONTENT_TYPE}
+        )
+        self._invalidate_reads(
+            f"{self._agents_url}/{agent_id}",
+            f"{self._twitter_accounts_url}/{account_data.get('twitter_user_id')}",
+        )
+        return await self._post_json(
+            f"{self._agents_url}/{agent_id}/twitter_accounts/", account_data, headers
+        )
 
     async def get_twitter_account(self, twitter_user_id: str) -> Dict:
         """Get a Twitter account."""
-        async with self.session.get(  # type: ignore
-            f"{self.base_url}/api/twitter_accounts/{twitter_user_id}",
-            headers={"access-token": f"{self.api_key}"},
-        ) as response:
-            return await response.json()
+        return await self._get_json(f"{self._twitter_accounts_url}/{twitter_user_id}")
 
     async def create_tweet(
         self, agent_id: int, twitter_user_id: str, tweet_data: Dict
     ) -> Dict:
         """Create a tweet."""
-        async with self.session.post(  # type: ignore
-            f"{self.base_url}/api/agents/{agent_id}/accounts/{twitter_user_id}/tweets/",
-            json=tweet_data,
-            headers={"access-token": f"{self.api_key}"},
-        ) as response:
-            return await response.json()
+        self._invalidate_reads(
+            f"{self._agents_url}/{agent_id}",
+            f"{self._twitter_accounts_url}/{twitter_user_id}",
+            f"{self._tweets_url}/{tweet_data.get('tweet_id')}",
+        )
+        return await self._post_json(
+            f"{self._agents_url}/{agent_id}/accounts/{twitter_user_id}/tweets/",
+            tweet_data,
+        )
 
     async def read_tweet(self, tweet_id: str) -> Dict:
         """Read a tweet."""
-        async with self.session.get(  # type: ignore
-            f"{self.base_url}/api/tweets/{tweet_id}",
-            headers={"access-token": f"{self.api_key}"},
-        ) as response:
-            return await response.json()
+        return await self._get_json(f"{self._tweets_url}/{tweet_id}")
 
     async def create_interaction(
         self, agent_id: int, twitter_user_id: str, interaction_data: Dict
     ) -> Dict:
         """Create an interaction."""
-        async with self.session.post(  # type: ignore
-            f"{self.base_url}/api/agents/{agent_id}/accounts/{twitter_user_id}/interactions/",
-            json=interaction_data,
-            headers={"access-token": f"{self.api_key}"},
-        ) as response:
-            return await response.json()
+        self._invalidate_reads(
+            f"{self._agents_url}/{agent_id}",
+            f"{self._twitter_accounts_url}/{twitter_user_id}",
+            f"{self._tweets_url}/{interaction_data.get('tweet_id')}",
+        )
+        return await self._post_json(
+            f"{self._agents_url}/{agent_id}/accounts/{twitter_user_id}/interactions/",
+            interaction_data,
+        )
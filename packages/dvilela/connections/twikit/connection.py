@@ -22,6 +22,7 @@
 
 import asyncio
 import json
+import random
 import time
 from asyncio import Task
 from datetime import datetime, timezone
@@ -45,7 +46,21 @@ PUBLIC_ID = PublicId.from_str("dvilela/twikit:0.1.0")
 
 MAX_POST_RETRIES = 5
 MAX_GET_RETRIES = 10
+MAX_CONCURRENT_REQUESTS = 3
+MAX_CALL_DELAY = 5  # seconds, exclusive
 HTTP_OK = 200
+AVAILABLE_METHODS = (
+    "search",
+    "post",
+    "get_user_tweets",
+    "get_user_tweets_batch",
+    "like_tweet",
+    "retweet",
+    "follow_user",
+    "filter_suspended_users",
+    "get_user_by_screen_name",
+    "call_many",
+)
 
 
 class SrrDialogues(BaseSrrDialogues):
@@ -239,16 +254,6 @@ class TwikitConnection(Connection):
         payload = json.loads(srr_message.payload)
 
         REQUIRED_PROPERTIES = ["method", "kwargs"]
-        AVAILABLE_METHODS = [
-            "search",
-            "post",
-            "get_user_tweets",
-            "like_tweet",
-            "retweet",
-            "follow_user",
-            "filter_suspended_users",
-            "get_user_by_screen_name",
-        ]
 
         if not all(i in payload for i in REQUIRED_PROPERTIES):
             return self.prepare_error_message(
@@ -385,7 +390,7 @@ class TwikitConnection(Connection):
             except twikit.errors.TweetNotAvailable:
                 self.logger.error("Failed to verify the tweet. Retrying...")
                 retries += 1
-                time.sleep(3)
+                await asyncio.sleep(3)
                 continue
 
         return None
@@ -402,7 +407,7 @@ class TwikitConnection(Connection):
             except Exception as e:
                 self.logger.error(f"Failed to delete the tweet: {e}. Retrying...")
                 retries += 1
-                time.sleep(3)
+                await asyncio.sleep(3)
 
     async def get_user_tweets(
         self, twitter_handle: str, tweet_type: str = "Tweets", count: int = 1
@@ -410,12 +415,38 @@ class TwikitConnection(Connection):
         """Get user tweets"""
 
         user = await self.client.get_user_by_screen_name(twitter_handle)
-        time.sleep(1)
+        await asyncio.sleep(1)
         tweets = await self.client.get_user_tweets(
             user_id=user.id, tweet_type=tweet_type, count=count
         )
         return [tweet_to_json(t) for t in tweets]
 
+    async def get_user_tweets_batch(
+        self, twitter_handles: List[str], tweet_type: str = "Tweets", count: int = 1
+    ) -> Dict[str, List[Dict]]:
+        """Get the tweets from several users concurrently"""
+        # Bound the fan-out so that large batches do not trip Twitter's rate limits
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+        async def _get_user_tweets(handle: str) -> List[Dict]:
+            """Get the tweets from a user, holding a slot for the whole call"""
+            async with semaphore:
+                return await self.get_user_tweets(
+                    handle, tweet_type=tweet_type, count=count
+                )
+
+        results = await asyncio.gather(
+            *(_get_user_tweets(handle) for handle in twitter_handles),
+            return_exceptions=True,
+        )
+        user_tweets: Dict[str, List[Dict]] = {}
+        for handle, result in zip(twitter_handles, results):
+            if isinstance(result, BaseException):
+                self.logger.error(f"Error while getting tweets from {handle}: {result}")
+                result = []
+            user_tweets[handle] = result
+        return user_tweets
+
     async def like_tweet(self, tweet_id: str) -> Dict:
         """Like a tweet"""
         response = await self.client.favorite_tweet(tweet_id)
@@ -445,6 +476,28 @@ class TwikitConnection(Connection):
                 continue
         return not_suspendend_users
 
+    async def call_many(self, calls: List[Dict]) -> List[Dict]:
+        """Run several method calls concurrently"""
+        # Most calls are writes (likes, retweets, posts...), so bound them and space
+        # them out to avoid getting the account rate limited
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+        async def _call(method_name: str, kwargs: Dict) -> Dict:
+            """Run a single call, capturing its error"""
+            if method_name not in AVAILABLE_METHODS or method_name == "call_many":
+                return {"error": f"Method {method_name} is not available"}
+            async with semaphore:
+                # This is just jitter, so there is no need for a secure generator
+                await asyncio.sleep(random.randrange(MAX_CALL_DELAY))  # nosec
+                try:
+                    return {"response": await getattr(self, method_name)(**kwargs)}
+                except Exception as e:
+                    return {"error": f"Exception while calling Twikit:\n{e}"}
+
+        return await asyncio.gather(
+            *(_call(call["method"], call.get("kwargs", {})) for call in calls)
+        )
+
     async def get_user_by_screen_name(self, screen_name: str) -> Dict:
         """Get user by screen name"""
         user = await self.client.get_user_by_screen_name(screen_name=screen_name)
@@ -22,9 +22,22 @@
 import json
 import re
 from abc import ABC
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Any, Dict, Generator, List, Optional, Tuple, cast
+from typing import (
+    Any,
+    ContextManager,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
 
+import orjson  # type: ignore
 from aea.protocols.base import Message
 
 from packages.dvilela.connections.genai.connection import (
@@ -52,6 +65,7 @@ from packages.valory.protocols.contract_api import ContractApiMessage
 from packages.valory.protocols.ledger_api import LedgerApiMessage
 from packages.valory.protocols.srr.dialogues import SrrDialogue, SrrDialogues
 from packages.valory.protocols.srr.message import SrrMessage
+from packages.valory.skills.abstract_round_abci.base import BaseTxPayload
 from packages.valory.skills.abstract_round_abci.behaviours import BaseBehaviour
 from packages.valory.skills.abstract_round_abci.models import Requests
 
@@ -61,6 +75,8 @@ CELO_CHAIN_ID = "celo"
 HTTP_OK = 200
 MEMEOOORR_DESCRIPTION_PATTERN = r"^Memeooorr @(\w+)$"
 IPFS_ENDPOINT = "https://gateway.autonolas.tech/ipfs/{ipfs_hash}"
+HEARTED_MEMES_TAIL_SIZE = 64
+TWEETS_TAIL_SIZE = 32
 
 
 TOKENS_QUERY = """
@@ -102,6 +118,31 @@ query getPackages($package_type: String!) {
 """
 
 
+def json_loads(data: Union[str, bytes]) -> Any:
+    """Deserialize JSON with orjson.
+
+    orjson parses integers that do not fit in 64 bits as floats, so data that
+    can hold such values (i.e. token supplies) must be loaded with json.loads.
+    """
+    return orjson.loads(data)
+
+
+def json_dumps(data: Any, sort_keys: bool = False) -> str:
+    """Serialize to compact JSON with orjson.
+
+    orjson rejects integers that do not fit in 64 bits, so those payloads are
+    serialized by json.dumps with the same separators instead.
+    """
+    try:
+        return orjson.dumps(
+            data, option=orjson.OPT_SORT_KEYS if sort_keys else None
+        ).decode()
+    except TypeError:
+        return json.dumps(
+            data, sort_keys=sort_keys, separators=(",", ":"), ensure_ascii=False
+        )
+
+
 class MemeooorrBaseBehaviour(
     BaseBehaviour, ABC
 ):  # pylint: disable=too-many-ancestors,too-many-public-methods
@@ -122,6 +163,28 @@ class MemeooorrBaseBehaviour(
         """Return the state."""
         return cast(SharedState, self.context.state)
 
+    def _measure(self, phase: str) -> ContextManager:
+        """Measure a behaviour phase, or do nothing if benchmarks are disabled."""
+        if not self.params.enable_benchmarks:
+            return nullcontext()
+        return getattr(self.context.benchmark_tool.measure(self.behaviour_id), phase)()
+
+    def _run_act(
+        self, payload_cls: Type[BaseTxPayload], **fields: Generator[None, None, Any]
+    ) -> Generator[None, None, None]:
+        """Compute the payload fields locally, then send the payload and wait for consensus."""
+        with self._measure("local"):
+            values: Dict[str, Any] = {}
+            for name, compute in fields.items():
+                values[name] = yield from compute
+            payload = payload_cls(sender=self.context.agent_address, **values)
+
+        with self._measure("consensus"):
+            yield from self.send_a2a_transaction(payload)
+            yield from self.wait_until_round_end()
+
+        self.set_done()
+
     def _do_connection_request(
         self,
         message: Message,
@@ -138,24 +201,14 @@ class MemeooorrBaseBehaviour(
         response = yield from self.wait_for_message(timeout=timeout)
         return response
 
-    def _call_twikit(  # pylint: disable=too-many-locals,too-many-statements
-        self, method: str, **kwargs: Any
-    ) -> Generator[None, None, Any]:
-        """Send a request message to the Twikit connection and handle MirrorDB interactions."""
-        # Define the mapping of Twikit methods to MirrorDB methods
-        twikit_to_mirrordb = {
-            "like_tweet": "create_interaction",
-            "retweet": "create_interaction",
-            "follow_user": "create_interaction",
-            "post": "create_tweet",
-        }
-
+    def _get_mirror_db_config(self) -> Generator[None, None, Dict]:
+        """Get the MirrorDB config, registering with MirrorDB if needed."""
         mirror_db_config_data = yield from self._read_kv(keys=("mirrod_db_config",))
         mirror_db_config_data = mirror_db_config_data["mirrod_db_config"]  # type: ignore
 
         # Ensure mirror_db_config_data is parsed as JSON if it is a string
         if isinstance(mirror_db_config_data, str):
-            mirror_db_config_data = json.loads(mirror_db_config_data)
+            mirror_db_config_data = json_loads(mirror_db_config_data)
 
         self.context.logger.info(f"MirrorDB config data: {mirror_db_config_data}")
         if mirror_db_config_data is None:
@@ -167,29 +220,98 @@ class MemeooorrBaseBehaviour(
 
         # Ensure mirror_db_config_data is parsed as JSON if it is a string
         if isinstance(mirror_db_config_data, str):
-            mirror_db_config_data = json.loads(mirror_db_config_data)
+            mirror_db_config_data = json_loads(mirror_db_config_data)
+
+        return mirror_db_config_data  # type: ignore
 
-        # Extract the agent_id, twitter_user_id and api_key from the mirrorDB config
-        agent_id = mirror_db_config_data["agent_id"]  # type: ignore
-        twitter_user_id = mirror_db_config_data["twitter_user_id"]  # type: ignore
+    def _call_twikit(self, method: str, **kwargs: Any) -> Generator[None, None, Any]:
+        """Send a request message to the Twikit connection and handle MirrorDB interactions."""
+        mirror_db_config = yield from self._get_mirror_db_config()
 
         # Create the request message for Twikit
         srr_dialogues = cast(SrrDialogues, self.context.srr_dialogues)
         srr_message, srr_dialogue = srr_dialogues.create(
             counterparty=str(TWIKIT_CONNECTION_PUBLIC_ID),
             performative=SrrMessage.Performative.REQUEST,
-            payload=json.dumps({"method": method, "kwargs": kwargs}),
+            payload=json_dumps({"method": method, "kwargs": kwargs}),
         )
         srr_message = cast(SrrMessage, srr_message)
         srr_dialogue = cast(SrrDialogue, srr_dialogue)
         response = yield from self._do_connection_request(srr_message, srr_dialogue)  # type: ignore
 
-        response_json = json.loads(response.payload)  # type: ignore
+        response_json = json_loads(response.payload)  # type: ignore
 
         if "error" in response_json:
             self.context.logger.error(response_json["error"])
             return None
 
+        yield from self._sync_twikit_call_to_mirrordb(
+            method, kwargs, response_json["response"], mirror_db_config
+        )
+        return response_json["response"]  # type: ignore
+
+    def _call_twikit_many(
+        self, calls: List[Tuple[str, Dict]]
+    ) -> Generator[None, None, List[Any]]:
+        """Send several concurrent Twikit calls in a single request and handle MirrorDB interactions."""
+        mirror_db_config = yield from self._get_mirror_db_config()
+
+        srr_dialogues = cast(SrrDialogues, self.context.srr_dialogues)
+        srr_message, srr_dialogue = srr_dialogues.create(
+            counterparty=str(TWIKIT_CONNECTION_PUBLIC_ID),
+            performative=SrrMessage.Performative.REQUEST,
+            payload=json_dumps(
+                {
+                    "method": "call_many",
+                    "kwargs": {
+                        "calls": [
+                            {"method": method, "kwargs": kwargs}
+                            for method, kwargs in calls
+                        ]
+                    },
+                }
+            ),
+        )
+        srr_message = cast(SrrMessage, srr_message)
+        srr_dialogue = cast(SrrDialogue, srr_dialogue)
+        response = yield from self._do_connection_request(srr_message, srr_dialogue)  # type: ignore
+
+        response_json = json_loads(response.payload)  # type: ignore
+
+        if "error" in response_json:
+            self.context.logger.error(response_json["error"])
+            return [None] * len(calls)
+
+        responses: List[Any] = []
+        for (method, kwargs), call_response in zip(calls, response_json["response"]):
+            if "error" in call_response:
+                self.context.logger.error(call_response["error"])
+                responses.append(None)
+                continue
+
+            yield from self._sync_twikit_call_to_mirrordb(
+                method, kwargs, call_response["response"], mirror_db_config
+            )
+            responses.append(call_response["response"])
+
+        return responses
+
+    def _sync_twikit_call_to_mirrordb(  # pylint: disable=too-many-locals
+        self, method: str, kwargs: Dict, response: Any, mirror_db_config: Dict
+    ) -> Generator[None, None, None]:
+        """Record a successful Twikit call in MirrorDB."""
+        # Define the mapping of Twikit methods to MirrorDB methods
+        twikit_to_mirrordb = {
+            "like_tweet": "create_interaction",
+            "retweet": "create_interaction",
+            "follow_user": "create_interaction",
+            "post": "create_tweet",
+        }
+
+        # Extract the agent_id and twitter_user_id from the mirrorDB config
+        agent_id = mirror_db_config["agent_id"]
+        twitter_user_id = mirror_db_config["twitter_user_id"]
+
         # Handle MirrorDB interaction if applicable
         if method in twikit_to_mirrordb:
             mirrordb_method = twikit_to_mirrordb[method]
@@ -203,15 +325,15 @@ class MemeooorrBaseBehaviour(
                     "user_name": self.params.twitter_username,
                     "text": tweet_text,
                     "created_at": datetime.utcnow().isoformat() + "Z",
-                    "tweet_id": response_json["response"][0],
+                    "tweet_id": response[0],
                 }
                 mirrordb_kwargs["tweet_data"] = tweet_data
                 mirrordb_kwargs["agent_id"] = agent_id  # Ensure agent_id is passed
-                mirrordb_kwargs[
-                    "twitter_user_id"
-                ] = twitter_user_id  # Ensure twitter_user_id is passed
+                mirrordb_kwargs["twitter_user_id"] = (
+                    twitter_user_id  # Ensure twitter_user_id is passed
+                )
                 # Use the tweet ID returned by Twikit
-                tweet_id = response_json["response"][0]
+                tweet_id = response[0]
                 mirrordb_kwargs["tweet_data"]["tweet_id"] = tweet_id
                 self.context.logger.info(f"mirrorDb kwargs: {mirrordb_kwargs}")
             elif method in [
@@ -252,21 +374,19 @@ class MemeooorrBaseBehaviour(
                     f"MirrorDB interaction for method {method} failed."
                 )
 
-        return response_json["response"]  # type: ignore
-
     def _call_mirrordb(self, method: str, **kwargs: Any) -> Generator[None, None, Any]:
         """Send a request message to the MirrorDB connection."""
         srr_dialogues = cast(SrrDialogues, self.context.srr_dialogues)
         srr_message, srr_dialogue = srr_dialogues.create(
             counterparty=str(MIRRORDB_CONNECTION_PUBLIC_ID),
             performative=SrrMessage.Performative.REQUEST,
-            payload=json.dumps({"method": method, "kwargs": kwargs}),
+            payload=json_dumps({"method": method, "kwargs": kwargs}),
         )
         srr_message = cast(SrrMessage, srr_message)
         srr_dialogue = cast(SrrDialogue, srr_dialogue)
         response = yield from self._do_connection_request(srr_message, srr_dialogue)  # type: ignore
 
-        response_json = json.loads(response.payload)  # type: ignore
+        response_json = json_loads(response.payload)  # type: ignore
 
         if "error" in response_json:
             self.context.logger.error(response_json["error"])
@@ -329,7 +449,7 @@ class MemeooorrBaseBehaviour(
             "api_key": agent_response["api_key"],
         }
         self.context.logger.info(f"Saving MirrorDB config data: {config_data}")
-        yield from self._write_kv({"mirrod_db_config": json.dumps(config_data)})
+        yield from self._write_kv({"mirrod_db_config": json_dumps(config_data)})
 
     def _get_twitter_user_data(self) -> Generator[None, None, Dict[str, str]]:
         """Get the twitter user data using Twikit."""
@@ -342,7 +462,7 @@ class MemeooorrBaseBehaviour(
         srr_message, srr_dialogue = srr_dialogues.create(
             counterparty=str(TWIKIT_CONNECTION_PUBLIC_ID),
             performative=SrrMessage.Performative.REQUEST,
-            payload=json.dumps(
+            payload=json_dumps(
                 {
                     "method": "get_user_by_screen_name",
                     "kwargs": {"screen_name": TWIKIT_USERNAME},
@@ -353,7 +473,7 @@ class MemeooorrBaseBehaviour(
         srr_dialogue = cast(SrrDialogue, srr_dialogue)
         response = yield from self._do_connection_request(srr_message, srr_dialogue)  # type: ignore
 
-        response_json = json.loads(response.payload)  # type: ignore
+        response_json = json_loads(response.payload)  # type: ignore
         if "error" in response_json:
             raise ValueError(response_json["error"])
 
@@ -376,13 +496,13 @@ class MemeooorrBaseBehaviour(
         srr_message, srr_dialogue = srr_dialogues.create(
             counterparty=str(GENAI_CONNECTION_PUBLIC_ID),
             performative=SrrMessage.Performative.REQUEST,
-            payload=json.dumps(payload_data),
+            payload=json_dumps(payload_data),
         )
         srr_message = cast(SrrMessage, srr_message)
         srr_dialogue = cast(SrrDialogue, srr_dialogue)
         response = yield from self._do_connection_request(srr_message, srr_dialogue)  # type: ignore
 
-        response_json = json.loads(response.payload)  # type: ignore
+        response_json = json_loads(response.payload)  # type: ignore
 
         if "error" in response_json:
             self.context.logger.error(response_json["error"])
@@ -525,15 +645,16 @@ class MemeooorrBaseBehaviour(
     ) -> Generator[None, None, Tuple[List[str], List[str], int]]:
         """Get heart, burn and purge data"""
         # Load previously hearted memes
-        db_data = yield from self._read_kv(keys=("hearted_memes",))
+        # Hearts are kept as a compacted list plus a short tail of recent ones
+        db_data = yield from self._read_kv(keys=("hearted_memes", "hearted_memes_tail"))
 
         if db_data is None:
             self.context.logger.error("Error while loading the database")
-            hearted_memes_str = "[]"
+            hearted_memes = []
         else:
-            hearted_memes_str = db_data["hearted_memes"] or "[]"
-
-        hearted_memes = json.loads(hearted_memes_str)
+            hearted_memes = json_loads(db_data["hearted_memes"] or "[]") + json_loads(
+                db_data["hearted_memes_tail"] or "[]"
+            )
 
         # Load purged memes
         purged_memes = yield from self.get_purged_memes_from_chain()
@@ -936,12 +1057,13 @@ class MemeooorrBaseBehaviour(
 
     def get_tweets_from_db(self) -> Generator[None, None, List[Dict]]:
         """Get tweets"""
-        db_data = yield from self._read_kv(keys=("tweets",))
+        db_data = yield from self._read_kv(keys=("tweets", "tweets_tail"))
 
         if db_data is None:
             tweets = []
         else:
-            tweets = json.loads(db_data["tweets"] or "[]")
+            tweets = json_loads(db_data["tweets"] or "[]")
+            tweets.extend(json_loads(db_data["tweets_tail"] or "[]"))
 
         return tweets
 
@@ -20,12 +20,17 @@
 """This package contains round behaviours of MemeooorrAbciApp."""
 
 import json
+import logging
 from abc import ABC
-from typing import Generator, Optional, Type, cast
+from functools import cached_property
+from typing import Callable, Dict, Generator, Optional, Type, cast
 
 from packages.dvilela.contracts.meme_factory.contract import MemeFactoryContract
 from packages.dvilela.skills.memeooorr_abci.behaviour_classes.base import (
+    HEARTED_MEMES_TAIL_SIZE,
     MemeooorrBaseBehaviour,
+    json_dumps,
+    json_loads,
 )
 from packages.dvilela.skills.memeooorr_abci.rounds import (
     ActionPreparationPayload,
@@ -52,10 +57,37 @@ ZERO_VALUE = 0
 TWO_MINUTES = 120
 SUMMON_BLOCK_DELTA = 100000
 
+# Builders for the kwargs of each meme factory build_{action}_tx callable
+ACTION_KWARGS_BUILDERS: Dict[str, Callable[[Dict], Dict]] = {
+    "summon": lambda token_action: {
+        "token_name": token_action["token_name"],
+        "token_ticker": token_action["token_ticker"],
+        "token_supply": int(token_action["token_supply"]),
+    },
+    "heart": lambda token_action: {"meme_nonce": token_action["token_nonce"]},
+    "unleash": lambda token_action: {"meme_nonce": token_action["token_nonce"]},
+    "collect": lambda token_action: {"meme_address": token_action["token_address"]},
+    "purge": lambda token_action: {"meme_address": token_action["token_address"]},
+    "burn": lambda token_action: {},
+}
+
+# Actions that send native value to the meme factory
+VALUE_ACTIONS = frozenset({"summon", "heart"})
+
 
 class ChainBehaviour(MemeooorrBaseBehaviour, ABC):  # pylint: disable=too-many-ancestors
     """ChainBehaviour"""
 
+    @cached_property
+    def _chain_id(self) -> str:
+        """The chain id, resolved once from the params"""
+        return self.get_chain_id()
+
+    @cached_property
+    def _meme_factory_address(self) -> str:
+        """The meme factory address, resolved once from the params"""
+        return self.get_meme_factory_address()
+
     def _build_safe_tx_hash(
         self,
         to_address: str,
@@ -65,7 +97,9 @@ class ChainBehaviour(MemeooorrBaseBehaviour, ABC):  # pylint: disable=too-many-a
         """Prepares and returns the safe tx hash for a tx."""
 
         self.context.logger.info(
-            f"Preparing Safe transaction [{self.synchronized_data.safe_contract_address}] value={value}"
+            "Preparing Safe transaction [%s] value=%s",
+            self.synchronized_data.safe_contract_address,
+            value,
         )
 
         # Prepare the safe transaction
@@ -78,25 +112,32 @@ class ChainBehaviour(MemeooorrBaseBehaviour, ABC):  # pylint: disable=too-many-a
             value=value,
             data=data,
             safe_tx_gas=SAFE_GAS,
-            chain_id=self.get_chain_id(),
+            chain_id=self._chain_id,
         )
 
         # Check for errors
         if response_msg.performative != ContractApiMessage.Performative.STATE:
             self.context.logger.error(
-                "Couldn't get safe tx hash. Expected response performative "
-                f"{ContractApiMessage.Performative.STATE.value!r}, "  # type: ignore
-                f"received {response_msg.performative.value!r}: {response_msg}."
+                "Couldn't get safe tx hash. Expected response performative %r, "
+                "received %r: %s.",
+                ContractApiMessage.Performative.STATE.value,  # type: ignore
+                response_msg.performative.value,
+                response_msg,
             )
             return None
 
-        # Extract the hash and check it has the correct length
+        # Extract the hash and check it has the correct length and prefix
         tx_hash: Optional[str] = cast(str, response_msg.state.body.get("tx_hash", None))
 
-        if tx_hash is None or len(tx_hash) != TX_HASH_LENGTH:
+        if (
+            not tx_hash
+            or len(tx_hash) != TX_HASH_LENGTH
+            or not tx_hash.startswith("0x")
+        ):
             self.context.logger.error(
                 "Something went wrong while trying to get the safe transaction hash. "
-                f"Invalid hash {tx_hash!r} was returned."
+                "Invalid hash %r was returned.",
+                tx_hash,
             )
             return None
 
@@ -111,26 +152,50 @@ class ChainBehaviour(MemeooorrBaseBehaviour, ABC):  # pylint: disable=too-many-a
             data=data,
         )
 
-        self.context.logger.info(f"Safe transaction hash is {safe_tx_hash}")
+        self.context.logger.info("Safe transaction hash is %s", safe_tx_hash)
 
         return safe_tx_hash
 
+    def _append_hearted(
+        self, db_data: Dict, token_nonce: int
+    ) -> Generator[None, None, Dict[str, str]]:
+        """Add a hearted token and return the db entries to write.
+
+        New hearts go to a short tail so that the common write stays small. Once the
+        tail is full, it is merged into the sorted hearted memes list.
+        """
+        tail = json_loads(db_data["hearted_memes_tail"] or "[]")
+        tail.append(token_nonce)
+        if len(tail) < HEARTED_MEMES_TAIL_SIZE:
+            return {"hearted_memes_tail": json_dumps(tail)}
+
+        if "hearted_memes" not in db_data:
+            hearted_data = yield from self._read_kv(keys=("hearted_memes",))
+
+            # Never overwrite the hearted memes list if it could not be loaded
+            if hearted_data is None:
+                return {"hearted_memes_tail": json_dumps(tail)}
+            db_data = {**db_data, **hearted_data}
+
+        hearted_memes = json_loads(db_data["hearted_memes"] or "[]")
+        return {
+            "hearted_memes": json_dumps(sorted(set(hearted_memes + tail))),
+            "hearted_memes_tail": json_dumps([]),
+        }
+
     def store_heart(self, token_nonce: int) -> Generator[None, None, None]:
         """Store a new hearted token to the db"""
-        # Load previously hearted memes
-        db_data = yield from self._read_kv(keys=("hearted_memes",))
+        # Load the recently hearted memes
+        db_data = yield from self._read_kv(keys=("hearted_memes_tail",))
 
+        # Never overwrite the stored tail if it could not be loaded
         if db_data is None:
             self.context.logger.error("Error while loading the database")
-            hearted_memes = []
-        else:
-            hearted_memes = json.loads(db_data["hearted_memes"] or "[]")
+            return
 
         # Write the new hearted token
-        hearted_memes.append(token_nonce)
-        yield from self._write_kv(
-            {"hearted_memes": json.dumps(hearted_memes, sort_keys=True)}
-        )
+        hearted_data = yield from self._append_hearted(db_data, token_nonce)
+        yield from self._write_kv(hearted_data)
         self.context.logger.info("Wrote latest hearted token to db")
 
 
@@ -142,7 +207,7 @@ class CheckFundsBehaviour(ChainBehaviour):  # pylint: disable=too-many-ancestors
     def async_act(self) -> Generator:
         """Do the act, supporting asynchronous execution."""
 
-        with self.context.benchmark_tool.measure(self.behaviour_id).local():
+        with self._measure("local"):
             event = yield from self.get_event()
 
             payload = CheckFundsPayload(
@@ -150,7 +215,7 @@ class CheckFundsBehaviour(ChainBehaviour):  # pylint: disable=too-many-ancestors
                 event=event,
             )
 
-        with self.context.benchmark_tool.measure(self.behaviour_id).consensus():
+        with self._measure("consensus"):
             yield from self.send_a2a_transaction(payload)
             yield from self.wait_until_round_end()
 
@@ -168,7 +233,9 @@ class CheckFundsBehaviour(ChainBehaviour):  # pylint: disable=too-many-ancestors
 
         if agent_native_balance < self.params.minimum_gas_balance:
             self.context.logger.info(
-                f"Agent has insufficient funds for gas: {agent_native_balance} < {self.params.minimum_gas_balance}"
+                "Agent has insufficient funds for gas: %s < %s",
+                agent_native_balance,
+                self.params.minimum_gas_balance,
             )
             return Event.NO_FUNDS.value
 
@@ -183,16 +250,21 @@ class PullMemesBehaviour(ChainBehaviour):  # pylint: disable=too-many-ancestors
     def async_act(self) -> Generator:
         """Do the act, supporting asynchronous execution."""
 
-        with self.context.benchmark_tool.measure(self.behaviour_id).local():
+        with self._measure("local"):
             meme_coins = yield from self.get_meme_coins()
-            self.context.logger.info(f"Meme token list: {meme_coins}")
+            self.context.logger.info("Meme token list: %s", meme_coins)
+
+            # Token dicts are always built with the same key order, so sorting
+            # the list is enough for all agents to produce the same payload
+            if meme_coins:
+                meme_coins = sorted(meme_coins, key=lambda t: t["token_nonce"])
 
             payload = PullMemesPayload(
                 sender=self.context.agent_address,
-                meme_coins=json.dumps(meme_coins, sort_keys=True),
+                meme_coins=json_dumps(meme_coins),
             )
 
-        with self.context.benchmark_tool.measure(self.behaviour_id).consensus():
+        with self._measure("consensus"):
             yield from self.send_a2a_transaction(payload)
             yield from self.wait_until_round_end()
 
@@ -205,13 +277,13 @@ class PullMemesBehaviour(ChainBehaviour):  # pylint: disable=too-many-ancestors
         ledger_api_response = yield from self.get_ledger_api_response(
             performative=LedgerApiMessage.Performative.GET_STATE,
             ledger_callable="get_block_number",
-            chain_id=self.get_chain_id(),
+            chain_id=self._chain_id,
         )
 
         # Check for errors on the response
         if ledger_api_response.performative != LedgerApiMessage.Performative.STATE:
             self.context.logger.error(
-                f"Error while retrieving block number: {ledger_api_response}"
+                "Error while retrieving block number: %s", ledger_api_response
             )
             return None
 
@@ -220,7 +292,7 @@ class PullMemesBehaviour(ChainBehaviour):  # pylint: disable=too-many-ancestors
             int, ledger_api_response.state.body["get_block_number_result"]
         )
 
-        self.context.logger.error(f"Got block number: {block_number}")
+        self.context.logger.debug("Got block number: %s", block_number)
 
         return block_number
 
@@ -233,7 +305,7 @@ class ActionPreparationBehaviour(ChainBehaviour):  # pylint: disable=too-many-an
     def async_act(self) -> Generator:
         """Do the act, supporting asynchronous execution."""
 
-        with self.context.benchmark_tool.measure(self.behaviour_id).local():
+        with self._measure("local"):
             tx_hash = yield from self.get_tx_hash()
 
             payload = ActionPreparationPayload(
@@ -241,7 +313,7 @@ class ActionPreparationBehaviour(ChainBehaviour):  # pylint: disable=too-many-an
                 tx_hash=tx_hash,
             )
 
-        with self.context.benchmark_tool.measure(self.behaviour_id).consensus():
+        with self._measure("consensus"):
             yield from self.send_a2a_transaction(payload)
             yield from self.wait_until_round_end()
 
@@ -264,35 +336,31 @@ class ActionPreparationBehaviour(ChainBehaviour):  # pylint: disable=too-many-an
 
         contract_callable = f"build_{action}_tx"
 
-        kwargs = {}
-
-        if action in ["summon"]:
-            kwargs["token_name"] = token_action["token_name"]
-            kwargs["token_ticker"] = token_action["token_ticker"]
-            kwargs["token_supply"] = int(token_action["token_supply"])
-
-        if action in ["heart", "unleash"]:
-            kwargs["meme_nonce"] = token_action["token_nonce"]
+        kwargs_builder = ACTION_KWARGS_BUILDERS.get(action)
+        if kwargs_builder is None:
+            self.context.logger.error("Unknown action %s", action)
+            return None
 
-        if action in ["collect", "purge"]:
-            kwargs["meme_address"] = token_action["token_address"]
+        kwargs = kwargs_builder(token_action)
 
-        self.context.logger.info(f"Preparing the {action} transaction: kwargs={kwargs}")
+        self.context.logger.info(
+            "Preparing the %s transaction: kwargs=%s", action, kwargs
+        )
 
         # Use the contract api to interact with the factory contract
         response_msg = yield from self.get_contract_api_response(
             performative=ContractApiMessage.Performative.GET_RAW_TRANSACTION,  # type: ignore
-            contract_address=self.get_meme_factory_address(),
+            contract_address=self._meme_factory_address,
             contract_id=str(MemeFactoryContract.contract_id),
             contract_callable=contract_callable,
-            chain_id=self.get_chain_id(),
+            chain_id=self._chain_id,
             **kwargs,
         )
 
         # Check that the response is what we expect
         if response_msg.performative != ContractApiMessage.Performative.RAW_TRANSACTION:
             self.context.logger.error(
-                f"Error while building the {action} tx: {response_msg}"
+                "Error while building the %s tx: %s", action, response_msg
             )
             return None
 
@@ -303,34 +371,24 @@ class ActionPreparationBehaviour(ChainBehaviour):  # pylint: disable=too-many-an
         # Ensure that the data is not None
         if data_bytes is None:
             self.context.logger.error(
-                f"Error while preparing the transaction: {response_msg}"
+                "Error while preparing the transaction: %s", response_msg
             )
             return None
 
-        data_hex = data_bytes.hex()
-        self.context.logger.info(f"Tx data is {data_hex}")
-
-        # Check for errors
-        if data_hex is None:
-            return None
+        # Avoid hex encoding the data unless it is going to be logged
+        if self.context.logger.isEnabledFor(logging.INFO):
+            self.context.logger.info("Tx data is %s", data_bytes.hex())
 
         # Prepare safe transaction
         value = (
-            ZERO_VALUE
-            if action not in ["summon", "heart"]
-            else int(token_action["amount"])
+            ZERO_VALUE if action not in VALUE_ACTIONS else int(token_action["amount"])
         )  # to wei
         safe_tx_hash = yield from self._build_safe_tx_hash(
-            to_address=self.get_meme_factory_address(),
-            data=bytes.fromhex(data_hex),
+            to_address=self._meme_factory_address,
+            data=data_bytes,
             value=value,
         )
 
-        # Optimistic design: we now store the hearted token address
-        # Ideally, this should be done after a succesful heart transaction
-        if action == "heart":
-            self.store_heart(token_action["token_nonce"])
-
         return safe_tx_hash
 
     def post_action(  # pylint: disable=too-many-locals
@@ -338,43 +396,60 @@ class ActionPreparationBehaviour(ChainBehaviour):  # pylint: disable=too-many-an
     ) -> Generator[None, None, None]:
         """Post action"""
         token_action = self.synchronized_data.token_action
-        token_nonce = yield from self.get_token_nonce()
+        action = token_action["action"]
+
+        self.context.logger.info("The %s has finished", action)
+
+        # Heart transactions do not emit a Summoned event, so the nonce is the
+        # one the action was prepared for
+        if action == "heart":
+            yield from self.store_heart(int(token_action["token_nonce"]))
+            self.context.logger.info("Stored hearted token")
+            return
 
-        self.context.logger.info(f"The {token_action['action']} has finished")
+        if action != "summon":
+            return
+
+        token_nonce = yield from self.get_token_nonce()
 
         if not token_nonce:
             self.context.logger.error("Token nonce is none")
             return
 
-        if token_action == "summon":  # nosec
-            # Read previous tokens from db
-            db_data = yield from self._read_kv(keys=("tokens",))
-
-            if db_data is None:
-                self.context.logger.error(
-                    "Error while loading tokens from the database"
-                )
-                tokens = []
-            else:
-                tokens = json.loads(db_data["tokens"]) if db_data["tokens"] else []
-
-            # Write token to db
-            token_action = self.synchronized_data.token_action
-            token_data = {
-                "token_name": token_action["token_name"],
-                "token_ticker": token_action["token_ticker"],
-                "total_supply": int(token_action["total_supply"]),
-                "token_nonce": token_nonce,
-            }
-            tokens.append(token_data)
-            yield from self._write_kv(
-                {"summoned_tokens": json.dumps(tokens, sort_keys=True)}
-            )
-            self.context.logger.info("Wrote latest token to db")
+        # Read previous tokens and hearted memes from db in a single call
+        db_data = yield from self._read_kv(
+            keys=("summoned_tokens", "hearted_memes", "hearted_memes_tail")
+        )
 
-        if token_action in ["summon", "heart"]:
-            self.store_heart(token_nonce)
-            self.context.logger.info("Stored hearted token")
+        # Never overwrite the stored tokens if they could not be loaded
+        if db_data is None:
+            self.context.logger.error("Error while loading tokens from the database")
+            return
+
+        # Token supplies can exceed 64 bits, so orjson is not used here
+        tokens = (
+            json.loads(db_data["summoned_tokens"]) if db_data["summoned_tokens"] else {}
+        )
+
+        # Tokens used to be stored as a list: index them by nonce
+        if isinstance(tokens, list):
+            tokens = {str(token["token_nonce"]): token for token in tokens}
+
+        # Summoning also hearts the token
+        hearted_data = yield from self._append_hearted(db_data, token_nonce)
+
+        # Write token to db
+        token_data = {
+            "token_name": token_action["token_name"],
+            "token_ticker": token_action["token_ticker"],
+            "total_supply": int(token_action["token_supply"]),
+            "token_nonce": token_nonce,
+        }
+        tokens[str(token_nonce)] = token_data
+        yield from self._write_kv(
+            {"summoned_tokens": json_dumps(tokens, sort_keys=True), **hearted_data}
+        )
+        self.context.logger.info("Wrote latest token and hearted token to db")
 
     def get_token_nonce(
         self,
@@ -384,18 +459,18 @@ class ActionPreparationBehaviour(ChainBehaviour):  # pylint: disable=too-many-an
         # Use the contract api to interact with the factory contract
         response_msg = yield from self.get_contract_api_response(
             performative=ContractApiMessage.Performative.GET_STATE,  # type: ignore
-            contract_address=self.get_meme_factory_address(),
+            contract_address=self._meme_factory_address,
             contract_id=str(MemeFactoryContract.contract_id),
             contract_callable="get_token_data",
             tx_hash=self.synchronized_data.final_tx_hash,
-            chain_id=self.get_chain_id(),
+            chain_id=self._chain_id,
         )
 
         # Check that the response is what we expect
         if response_msg.performative != ContractApiMessage.Performative.STATE:
-            self.context.logger.error(f"Could not get the token data: {response_msg}")
+            self.context.logger.error("Could not get the token data: %s", response_msg)
             return None
 
         token_nonce = cast(int, response_msg.state.body.get("token_nonce", None))
-        self.context.logger.info(f"Token nonce is {token_nonce}")
+        self.context.logger.info("Token nonce is %s", token_nonce)
         return token_nonce
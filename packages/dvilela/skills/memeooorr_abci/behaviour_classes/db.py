@@ -41,7 +41,7 @@ class LoadDatabaseBehaviour(
     def async_act(self) -> Generator:
         """Do the act, supporting asynchronous execution."""
 
-        with self.context.benchmark_tool.measure(self.behaviour_id).local():
+        with self._measure("local"):
             persona = yield from self.load_db()
 
             payload = LoadDatabasePayload(
@@ -49,7 +49,7 @@ class LoadDatabaseBehaviour(
                 persona=persona,
             )
 
-        with self.context.benchmark_tool.measure(self.behaviour_id).consensus():
+        with self._measure("consensus"):
             yield from self.send_a2a_transaction(payload)
             yield from self.wait_until_round_end()
 
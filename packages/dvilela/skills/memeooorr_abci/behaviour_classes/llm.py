@@ -63,7 +63,7 @@ class ActionDecisionBehaviour(
     def async_act(self) -> Generator:
         """Do the act, supporting asynchronous execution."""
 
-        with self.context.benchmark_tool.measure(self.behaviour_id).local():
+        with self._measure("local"):
             (
                 event,
                 action,
@@ -91,7 +91,7 @@ class ActionDecisionBehaviour(
                 new_persona=new_persona,
             )
 
-        with self.context.benchmark_tool.measure(self.behaviour_id).consensus():
+        with self._measure("consensus"):
             yield from self.send_a2a_transaction(payload)
             yield from self.wait_until_round_end()
 
@@ -19,15 +19,35 @@
 
 """This package contains round behaviours of MemeooorrAbciApp."""
 
+import base64
+import hashlib
+import heapq
 import json
+import math
+import random
 import re
-import secrets
-from typing import Dict, Generator, List, Optional, Tuple, Type, Union
-
-from twitter_text import parse_tweet  # type: ignore
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import islice
+from typing import (
+    Callable,
+    Collection,
+    Dict,
+    Generator,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
 from packages.dvilela.skills.memeooorr_abci.behaviour_classes.base import (
     MemeooorrBaseBehaviour,
+    TWEETS_TAIL_SIZE,
+    json_dumps,
+    json_loads,
 )
 from packages.dvilela.skills.memeooorr_abci.prompts import TWITTER_DECISION_PROMPT
 from packages.dvilela.skills.memeooorr_abci.rounds import (
@@ -45,12 +65,53 @@ from packages.valory.skills.abstract_round_abci.base import AbstractRound
 MAX_TWEET_CHARS = 280
 JSON_RESPONSE_REGEXES = [r"json.?({.*})", r"json({.*})", r"\`\`\`json(.*)\`\`\`"]
 MAX_TWEET_PREPARATIONS_RETRIES = 3
+MAX_ACTION_DELAY = 5  # seconds, exclusive
+MAX_FEEDBACK_TWEETS = 10
+TWEET_VALIDATION_CACHE_SIZE = 1024
+INTERACTED_TWEET_IDS_TAIL_SIZE = 64
+BLOOM_ERROR_RATE = 0.01
+BLOOM_MIN_CAPACITY = 1024
+LLM_CACHE_TTL = 1800  # seconds
+LLM_CACHE_SIZE = 128
+
+_QUOTE_URL = "https://x.com/{}/status/{}".format
+_FORMAT_TWITTER_DECISION_PROMPT = TWITTER_DECISION_PROMPT.format_map
+_REPLY_NOISE_REGEX = re.compile(r"https?://\S+|@\w+")
+_POSSIBLE_URL_REGEX = re.compile(r"\.\w")
+_JSON_REGEXES = [re.compile(regex, re.DOTALL) for regex in JSON_RESPONSE_REGEXES]
+
+# Builders for the Twikit method and kwargs of each interaction,
+# called with (tweet_id, text, user_name)
+INTERACTION_CALL_BUILDERS: Dict[
+    str, Callable[[str, str, Optional[str]], Tuple[str, Dict]]
+] = {
+    "tweet": lambda tweet_id, text, user_name: ("post", {"tweets": [{"text": text}]}),
+    "like": lambda tweet_id, text, user_name: ("like_tweet", {"tweet_id": tweet_id}),
+    "retweet": lambda tweet_id, text, user_name: ("retweet", {"tweet_id": tweet_id}),
+    "follow": lambda tweet_id, text, user_name: ("follow_user", {"user_id": tweet_id}),
+    "reply": lambda tweet_id, text, user_name: (
+        "post",
+        {"tweets": [{"text": text, "reply_to": tweet_id}]},
+    ),
+    "quote": lambda tweet_id, text, user_name: (
+        "post",
+        {"tweets": [{"text": text, "attachment_url": _QUOTE_URL(user_name, tweet_id)}]},
+    ),
+}
 
 
 def parse_json_from_llm(response: str) -> Optional[Union[Dict, List]]:
     """Parse JSON from LLM response"""
-    for JSON_RESPONSE_REGEX in JSON_RESPONSE_REGEXES:
-        match = re.search(JSON_RESPONSE_REGEX, response, re.DOTALL)
+    # Fast path: the LLM returned pure JSON
+    try:
+        loaded_response = json.loads(response)
+        if isinstance(loaded_response, (dict, list)):
+            return loaded_response
+    except json.JSONDecodeError:
+        pass
+
+    for json_regex in _JSON_REGEXES:
+        match = json_regex.search(response)
         if not match:
             continue
 
@@ -62,9 +123,112 @@ def parse_json_from_llm(response: str) -> Optional[Union[Dict, List]]:
     return None
 
 
+def _score(tweet: Dict) -> int:
+    """Popularity score of a tweet: a weighted sum of views, retweets and quotes"""
+    return (
+        int(tweet.get("view_count", 0) or 0)
+        + 3 * int(tweet.get("retweet_count", 0) or 0)
+        + 5 * int(tweet.get("quote_count", 0) or 0)
+    )
+
+
+def _dedupe(feedback: List[Dict]) -> List[Dict]:
+    """Keep the most popular reply among those with the same normalized text"""
+    best: Dict[str, Dict] = {}
+    unkeyed: List[Dict] = []
+    for tweet in feedback:
+        # Ignore case, links, mentions and whitespace so that near-duplicates collide
+        text = _REPLY_NOISE_REGEX.sub("", (tweet.get("text") or "").lower())
+        key = " ".join(text.split())
+
+        # Replies made only of links or mentions are not duplicates of each other
+        if not key:
+            unkeyed.append(tweet)
+            continue
+
+        current = best.get(key)
+        if current is None or _score(tweet) > _score(current):
+            best[key] = tweet
+    return [*best.values(), *unkeyed]
+
+
+@lru_cache(maxsize=TWEET_VALIDATION_CACHE_SIZE)
 def is_tweet_valid(tweet: str) -> bool:
     """Checks a tweet length"""
-    return parse_tweet(tweet).asdict()["weightedLength"] <= MAX_TWEET_CHARS
+    # Plain ASCII text without URLs weighs exactly one per character
+    if tweet.isascii() and not _POSSIBLE_URL_REGEX.search(tweet):
+        return len(tweet) <= MAX_TWEET_CHARS
+
+    # twitter_text is slow to import, so only load it when it is needed
+    # pylint: disable-next=import-outside-toplevel
+    from twitter_text import parse_tweet  # type: ignore
+
+    return parse_tweet(tweet).weightedLength <= MAX_TWEET_CHARS
+
+
+class BloomFilter:
+    """A fixed size bloom filter over integers that can be stored as a string"""
+
+    def __init__(
+        self, size: int, num_hashes: int, bits: Optional[bytearray] = None
+    ) -> None:
+        """Initialize the filter"""
+        self.size = size
+        self.num_hashes = num_hashes
+        self.bits = bits if bits is not None else bytearray((size + 7) // 8)
+
+    @classmethod
+    def from_items(
+        cls, items: Collection[int], error_rate: float = BLOOM_ERROR_RATE
+    ) -> "BloomFilter":
+        """Build a filter sized for the given items"""
+        capacity = max(len(items), BLOOM_MIN_CAPACITY)
+        size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        num_hashes = max(1, round(size / capacity * math.log(2)))
+        bloom = cls(size, num_hashes)
+        for item in items:
+            bloom.add(item)
+        return bloom
+
+    @classmethod
+    def loads(cls, data: str) -> "BloomFilter":
+        """Load a filter from its string form"""
+        loaded = json_loads(data)
+        return cls(
+            loaded["size"],
+            loaded["num_hashes"],
+            bytearray(base64.b64decode(loaded["bits"])),
+        )
+
+    def dumps(self) -> str:
+        """Dump the filter to a string"""
+        return json_dumps(
+            {
+                "size": self.size,
+                "num_hashes": self.num_hashes,
+                "bits": base64.b64encode(self.bits).decode(),
+            }
+        )
+
+    def _positions(self, item: int) -> Iterator[int]:
+        """Get the bit positions of an item, using double hashing"""
+        # Python's hash() is salted per process, so use a stable hash instead
+        digest = hashlib.blake2b(str(item).encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.num_hashes))
+
+    def add(self, item: int) -> None:
+        """Add an item"""
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: int) -> bool:
+        """Check whether an item may have been added"""
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
 
 
 class BaseTweetBehaviour(MemeooorrBaseBehaviour):  # pylint: disable=too-many-ancestors
@@ -76,12 +240,34 @@ class BaseTweetBehaviour(MemeooorrBaseBehaviour):  # pylint: disable=too-many-an
         self, tweet: Union[dict, List[dict]]
     ) -> Generator[None, None, bool]:
         """Store tweet"""
-        tweets = yield from self.get_tweets_from_db()
+        # New tweets go to a short tail so that the common write stays small
+        db_data = yield from self._read_kv(keys=("tweets_tail",))
+        if db_data is None:
+            self.context.logger.error("Error while loading the database")
+            return False
+
+        tail = json_loads(db_data["tweets_tail"] or "[]")
         if isinstance(tweet, list):
-            tweets.extend(tweet)
+            tail.extend(tweet)
         else:
-            tweets.append(tweet)
-        yield from self._write_kv({"tweets": json.dumps(tweets)})
+            tail.append(tweet)
+
+        if len(tail) < TWEETS_TAIL_SIZE:
+            yield from self._write_kv({"tweets_tail": json_dumps(tail)})
+            return True
+
+        # Merge the full tail into the tweets list
+        db_data = yield from self._read_kv(keys=("tweets",))
+        if db_data is None:
+            self.context.logger.error("Error while loading the database")
+            yield from self._write_kv({"tweets_tail": json_dumps(tail)})
+            return True
+
+        tweets = json_loads(db_data["tweets"] or "[]")
+        tweets.extend(tail)
+        yield from self._write_kv(
+            {"tweets": json_dumps(tweets), "tweets_tail": json_dumps([])}
+        )
         return True
 
     def post_tweet(
@@ -113,47 +299,15 @@ class BaseTweetBehaviour(MemeooorrBaseBehaviour):  # pylint: disable=too-many-an
 
         return latest_tweet
 
-    def respond_tweet(
-        self,
-        tweet_id: str,
-        text: str,
-        quote: bool = False,
-        user_name: Optional[str] = None,
-    ) -> Generator[None, None, bool]:
-        """Like a tweet"""
-
-        self.context.logger.info(f"Liking tweet with ID: {tweet_id}")
-        tweet = {"text": text}
-        if quote:
-            tweet["attachment_url"] = f"https://x.com/{user_name}/status/{tweet_id}"
-        else:
-            tweet["reply_to"] = tweet_id
-        tweet_ids = yield from self._call_twikit(
-            method="post",
-            tweets=[tweet],
-        )
-        return tweet_ids is not None and tweet_ids
-
-    def like_tweet(self, tweet_id: str) -> Generator[None, None, bool]:
-        """Like a tweet"""
-        self.context.logger.info(f"Liking tweet with ID: {tweet_id}")
-
-        response = yield from self._call_twikit(method="like_tweet", tweet_id=tweet_id)
-        return response["success"]
-
-    def retweet(self, tweet_id: str) -> Generator[None, None, bool]:
-        """Reweet"""
-        self.context.logger.info(f"Retweeting tweet with ID: {tweet_id}")
-
-        response = yield from self._call_twikit(method="retweet", tweet_id=tweet_id)
-        return response["success"]
-
-    def follow_user(self, user_id: str) -> Generator[None, None, bool]:
-        """Follow user"""
-        self.context.logger.info(f"Following user with ID: {user_id}")
-
-        response = yield from self._call_twikit(method="follow_user", user_id=user_id)
-        return response["success"]
+    @staticmethod
+    def build_interaction_call(
+        action: str, tweet_id: str, text: str, user_name: Optional[str] = None
+    ) -> Optional[Tuple[str, Dict]]:
+        """Build the Twikit method and kwargs for an interaction"""
+        builder = INTERACTION_CALL_BUILDERS.get(action)
+        if builder is None:
+            return None
+        return builder(tweet_id, text, user_name)
 
     def get_previous_tweets(
         self, twitter_handle: str, limit: int = 20
@@ -168,7 +322,7 @@ class BaseTweetBehaviour(MemeooorrBaseBehaviour):  # pylint: disable=too-many-an
             Generator yielding Optional[str]: Numbered list of tweets or empty string
         """
 
-        delay = secrets.randbelow(5)
+        delay = random.randrange(MAX_ACTION_DELAY)  # nosec
         self.context.logger.info(f"Sleeping for {delay} seconds")
         yield from self.sleep(delay)
 
@@ -179,11 +333,10 @@ class BaseTweetBehaviour(MemeooorrBaseBehaviour):  # pylint: disable=too-many-an
         )
 
         if previous_tweets:
-            numbered_tweets = [
-                f"{i+1}. {tweet['text']}"
-                for i, tweet in enumerate(previous_tweets[:limit])
-            ]
-            return "\n".join(numbered_tweets)
+            return "\n".join(
+                f"{i}. {tweet['text']}"
+                for i, tweet in enumerate(islice(previous_tweets, limit), start=1)
+            )
 
         return ""
 
@@ -198,19 +351,14 @@ class CollectFeedbackBehaviour(
     def async_act(self) -> Generator:
         """Do the act, supporting asynchronous execution."""
 
-        with self.context.benchmark_tool.measure(self.behaviour_id).local():
-            feedback = yield from self.get_feedback()
-
-            payload = CollectFeedbackPayload(
-                sender=self.context.agent_address,
-                feedback=json.dumps(feedback, sort_keys=True),
-            )
-
-        with self.context.benchmark_tool.measure(self.behaviour_id).consensus():
-            yield from self.send_a2a_transaction(payload)
-            yield from self.wait_until_round_end()
+        yield from self._run_act(
+            CollectFeedbackPayload, feedback=self.get_serialized_feedback()
+        )
 
-        self.set_done()
+    def get_serialized_feedback(self) -> Generator[None, None, str]:
+        """Get the responses as a payload string"""
+        feedback = yield from self.get_feedback()
+        return json_dumps(feedback, sort_keys=True)
 
     def get_feedback(self) -> Generator[None, None, Optional[List]]:
         """Get the responses"""
@@ -236,21 +384,9 @@ class CollectFeedbackBehaviour(
 
         self.context.logger.info(f"Retrieved {len(feedback)} replies")
 
-        # Sort tweets by popularity using a weighted sum (views + quotes + retweets)
-        feedback = list(
-            sorted(
-                feedback,
-                key=lambda t: int(t.get("view_count", 0) or 0)
-                + 3 * int(t.get("retweet_count", 0) or 0)
-                + 5 * int(t.get("quote_count", 0) or 0),
-                reverse=True,
-            )
-        )
-
-        # Keep only the most relevant tweet to avoid sending too many tokens to the LLM
-        feedback = feedback[:10]
-
-        return feedback
+        # Drop duplicated replies and keep only the most popular ones
+        # to avoid sending too many tokens to the LLM
+        return heapq.nlargest(MAX_FEEDBACK_TWEETS, _dedupe(feedback), key=_score)
 
 
 class EngageTwitterBehaviour(BaseTweetBehaviour):  # pylint: disable=too-many-ancestors
@@ -258,22 +394,13 @@ class EngageTwitterBehaviour(BaseTweetBehaviour):  # pylint: disable=too-many-an
 
     matching_round: Type[AbstractRound] = EngageTwitterRound
 
+    # Behaviours are instantiated on every round, so the cache lives in the class
+    _llm_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
     def async_act(self) -> Generator:
         """Do the act, supporting asynchronous execution."""
 
-        with self.context.benchmark_tool.measure(self.behaviour_id).local():
-            event = yield from self.get_event()
-
-            payload = EngageTwitterPayload(
-                sender=self.context.agent_address,
-                event=event,
-            )
-
-        with self.context.benchmark_tool.measure(self.behaviour_id).consensus():
-            yield from self.send_a2a_transaction(payload)
-            yield from self.wait_until_round_end()
-
-        self.set_done()
+        yield from self._run_act(EngageTwitterPayload, event=self.get_event())
 
     def get_event(self) -> Generator[None, None, str]:
         """Get the next event"""
@@ -293,55 +420,152 @@ class EngageTwitterBehaviour(BaseTweetBehaviour):  # pylint: disable=too-many-an
         self.context.logger.info(f"Not suspended users: {agent_handles}")
 
         # Load previously responded tweets
-        db_data = yield from self._read_kv(keys=("interacted_tweet_ids",))
+        index = yield from self._read_interacted_tweet_ids_index()
 
-        if db_data is None:
-            self.context.logger.error("Error while loading the database")
-            interacted_tweet_ids = []
-        else:
-            interacted_tweet_ids = json.loads(db_data["interacted_tweet_ids"] or "[]")
+        # Get their latest tweet. By default only 1 tweet is retrieved (the latest one)
+        user_tweets = yield from self._call_twikit(
+            method="get_user_tweets_batch",
+            twitter_handles=agent_handles,
+        )
+        user_tweets = user_tweets or {}
 
-        # Get their latest tweet
-        pending_tweets = {}
+        latest_tweets = []
         for agent_handle in agent_handles:
-            # By default only 1 tweet is retrieved (the latest one)
-            latest_tweets = yield from self._call_twikit(
-                method="get_user_tweets",
-                twitter_handle=agent_handle,
-            )
-            if not latest_tweets:
+            tweets = user_tweets.get(agent_handle)
+            if not tweets:
                 self.context.logger.info("Couldn't get any tweets")
                 continue
-            tweet_id = latest_tweets[0]["id"]
+            latest_tweets.append(tweets[0])
+
+        pending_tweets, interacted_tweet_ids = yield from self._get_pending_tweets(
+            latest_tweets, index
+        )
+
+        # Build and post interactions
+        event, new_interacted_tweet_ids = yield from self.interact_twitter(
+            pending_tweets
+        )
+        if event != Event.DONE.value:
+            new_interacted_tweet_ids = []
+
+        # Writing the tail back without its stored contents would drop them
+        if index is None:
+            if new_interacted_tweet_ids:
+                self.context.logger.error(
+                    "Not storing the interacted tweets as the database could not be loaded"
+                )
+            return event
+
+        yield from self._store_interacted_tweet_ids(
+            index, new_interacted_tweet_ids, interacted_tweet_ids
+        )
+
+        return event
+
+    def _read_interacted_tweet_ids_index(
+        self,
+    ) -> Generator[None, None, Optional[Tuple[List[int], Optional[BloomFilter]]]]:
+        """Load the tail of the latest interacted tweet ids and the bloom filter of the rest.
+
+        The bloom filter rules out most tweets without loading the full list of ids.
+        """
+        db_data = yield from self._read_kv(
+            keys=("interacted_tweet_ids_bloom", "interacted_tweet_ids_tail")
+        )
+        if db_data is None:
+            self.context.logger.error("Error while loading the database")
+            return None
+
+        tail = [
+            int(i) for i in json_loads(db_data["interacted_tweet_ids_tail"] or "[]")
+        ]
+        bloom = (
+            BloomFilter.loads(db_data["interacted_tweet_ids_bloom"])
+            if db_data["interacted_tweet_ids_bloom"]
+            else None
+        )
+        return tail, bloom
+
+    def _get_pending_tweets(
+        self,
+        latest_tweets: List[Dict],
+        index: Optional[Tuple[List[int], Optional[BloomFilter]]],
+    ) -> Generator[None, None, Tuple[Dict, Optional[Set[int]]]]:
+        """Get the tweets that were not interacted with, and the full list if it was loaded"""
+        recent_tweet_ids, bloom = (set(index[0]), index[1]) if index else (set(), None)
+
+        # The full list is only needed if the bloom filter can't rule out some tweet
+        interacted_tweet_ids: Optional[Set[int]] = None
+        if index is not None and any(
+            int(tweet["id"]) not in recent_tweet_ids
+            and (bloom is None or int(tweet["id"]) in bloom)
+            for tweet in latest_tweets
+        ):
+            interacted_tweet_ids = yield from self._read_interacted_tweet_ids()
+
+        pending_tweets = {}
+        for tweet in latest_tweets:
+            tweet_id = int(tweet["id"])
 
             # Only respond to not previously interacted tweets
-            if int(tweet_id) in interacted_tweet_ids:
+            if tweet_id in recent_tweet_ids or (
+                interacted_tweet_ids is not None and tweet_id in interacted_tweet_ids
+            ):
                 self.context.logger.info("Tweet was already interacted with")
                 continue
 
-            pending_tweets[tweet_id] = {
-                "text": latest_tweets[0]["text"],
-                "user_name": latest_tweets[0]["user_name"],
+            pending_tweets[tweet["id"]] = {
+                "text": tweet["text"],
+                "user_name": tweet["user_name"],
             }
 
-        # Build and post interactions
-        event, new_interacted_tweet_ids = yield from self.interact_twitter(
-            pending_tweets
-        )
+        return pending_tweets, interacted_tweet_ids
 
-        if event == Event.DONE.value:
-            interacted_tweet_ids.extend(new_interacted_tweet_ids)
-            # Write latest responded tweets to the database
-            yield from self._write_kv(
-                {
-                    "interacted_tweet_ids": json.dumps(
-                        interacted_tweet_ids, sort_keys=True
-                    )
-                }
+    def _store_interacted_tweet_ids(
+        self,
+        index: Tuple[List[int], Optional[BloomFilter]],
+        new_interacted_tweet_ids: List,
+        interacted_tweet_ids: Optional[Set[int]],
+    ) -> Generator:
+        """Add the new interacted tweet ids to the tail, merging it once it is full"""
+        interacted_tweet_ids_tail, bloom = index
+
+        db_update = {}
+        if new_interacted_tweet_ids:
+            interacted_tweet_ids_tail.extend(int(i) for i in new_interacted_tweet_ids)
+            db_update["interacted_tweet_ids_tail"] = json_dumps(
+                interacted_tweet_ids_tail
             )
+
+        # The full list and its bloom filter are only rewritten when the tail is full
+        # or the filter is missing
+        tail_is_full = len(interacted_tweet_ids_tail) >= INTERACTED_TWEET_IDS_TAIL_SIZE
+        if tail_is_full or bloom is None:
+            if interacted_tweet_ids is None:
+                interacted_tweet_ids = yield from self._read_interacted_tweet_ids()
+
+            if interacted_tweet_ids is not None:
+                if tail_is_full:
+                    interacted_tweet_ids.update(interacted_tweet_ids_tail)
+                    db_update["interacted_tweet_ids"] = json_dumps(
+                        sorted(interacted_tweet_ids)
+                    )
+                    db_update["interacted_tweet_ids_tail"] = json_dumps([])
+                db_update["interacted_tweet_ids_bloom"] = BloomFilter.from_items(
+                    interacted_tweet_ids
+                ).dumps()
+
+        if db_update:
+            yield from self._write_kv(db_update)
             self.context.logger.info("Wrote latest tweet to db")
 
-        return event
+    def _read_interacted_tweet_ids(self) -> Generator[None, None, Optional[Set[int]]]:
+        """Load the full set of interacted tweet ids"""
+        db_data = yield from self._read_kv(keys=("interacted_tweet_ids",))
+        if db_data is None:
+            self.context.logger.error("Error while loading the database")
+            return None
+        return {int(i) for i in json_loads(db_data["interacted_tweet_ids"] or "[]")}
 
     def interact_twitter(  # pylint: disable=too-many-locals,too-many-statements
         self, pending_tweets: dict
@@ -351,10 +575,8 @@ class EngageTwitterBehaviour(BaseTweetBehaviour):  # pylint: disable=too-many-an
         persona = yield from self.get_persona()
 
         other_tweets = "\n\n".join(
-            [
-                f"tweet_id: {t_id}\ntweet_text: {t_data['text']}"
-                for t_id, t_data in pending_tweets.items()
-            ]
+            f"tweet_id: {t_id}\ntweet_text: {t_data['text']}"
+            for t_id, t_data in pending_tweets.items()
         )
 
         # Get at most your 5 latest tweets
@@ -363,22 +585,24 @@ class EngageTwitterBehaviour(BaseTweetBehaviour):  # pylint: disable=too-many-an
 
         if tweets:
             previous_tweets = "\n\n".join(
-                [
-                    f"tweet_id: {tweet['tweet_id']}\ntweet_text: {tweet['text']}\ntimestamp: {tweet['timestamp']}"
-                    for tweet in tweets
-                ]
+                f"tweet_id: {tweet['tweet_id']}\ntweet_text: {tweet['text']}\ntimestamp: {tweet['timestamp']}"
+                for tweet in tweets
             )
         else:
             previous_tweets = "No previous tweets"
 
-        prompt = TWITTER_DECISION_PROMPT.format(
-            persona=persona,
-            previous_tweets=previous_tweets,
-            other_tweets=other_tweets,
-            time=self.get_sync_time_str(),
+        prompt = _FORMAT_TWITTER_DECISION_PROMPT(
+            {
+                "persona": persona,
+                "previous_tweets": previous_tweets,
+                "other_tweets": other_tweets,
+                "time": self.get_sync_time_str(),
+            }
         )
 
-        llm_response = yield from self._call_genai(prompt=prompt)
+        llm_response = yield from self._get_llm_decision(
+            prompt, (persona, previous_tweets, other_tweets)
+        )
         self.context.logger.info(f"LLM response for twitter decision: {llm_response}")
 
         if llm_response is None:
@@ -390,67 +614,100 @@ class EngageTwitterBehaviour(BaseTweetBehaviour):  # pylint: disable=too-many-an
         if not json_response:
             return Event.ERROR.value, new_interacted_tweet_ids
 
+        # Validate the interactions and build their Twikit calls
+        calls: List[Tuple[str, Dict]] = []
+        call_tweet_ids: List[Optional[str]] = []
         for interaction in json_response:
             tweet_id = interaction.get("tweet_id", None)
             action = interaction.get("action", None)
             text = interaction.get("text", None)
+            sid = str(tweet_id)
 
             if action == "none":
                 continue
 
-            if action != "tweet" and str(tweet_id) not in pending_tweets.keys():
+            if action != "tweet" and sid not in pending_tweets:
                 continue
 
-            # use yield from self.sleep(1) to simulate a delay use secrests to randomize the delay
-            # adding random delay to avoid rate limiting
-            delay = secrets.randbelow(5)
-            self.context.logger.info(f"Sleeping for {delay} seconds")
-            yield from self.sleep(delay)
+            if action in ("reply", "quote") and not is_tweet_valid(text):
+                self.context.logger.error("The tweet is too long.")
+                continue
 
-            self.context.logger.info("Sending a new tweet")
-            if action == "tweet":
-                yield from self.post_tweet(tweet=[text], store=True)
+            user_name = pending_tweets[sid]["user_name"] if action != "tweet" else None
+            call = self.build_interaction_call(action, tweet_id, text, user_name)
+            if call is None:
                 continue
 
             self.context.logger.info(f"Trying to {action} tweet {tweet_id}")
-            user_name = pending_tweets[str(tweet_id)]["user_name"]
-
-            if action == "like":
-                liked = yield from self.like_tweet(tweet_id)
-                if liked:
-                    new_interacted_tweet_ids.append(tweet_id)
-                continue
+            calls.append(call)
+            # New tweets are not interactions with other tweets
+            call_tweet_ids.append(None if action == "tweet" else tweet_id)
 
-            if action == "follow":
-                followed = yield from self.follow_user(tweet_id)
-                if followed:
-                    new_interacted_tweet_ids.append(tweet_id)
-                continue
+        if not calls:
+            return Event.DONE.value, new_interacted_tweet_ids
 
-            if action == "retweet":
-                retweeted = yield from self.retweet(tweet_id)
-                if retweeted:
-                    new_interacted_tweet_ids.append(tweet_id)
-                continue
+        # Add a random delay to avoid rate limiting. This is just jitter, so
+        # there is no need for a cryptographically secure generator
+        delay = random.randrange(MAX_ACTION_DELAY)  # nosec
+        self.context.logger.info(f"Sleeping for {delay} seconds")
+        yield from self.sleep(delay)
 
-            if not is_tweet_valid(text):
-                self.context.logger.error("The tweet is too long.")
+        # Send all the interactions. The connection bounds and spaces them out
+        responses = yield from self._call_twikit_many(calls)
+
+        new_tweets = []
+        for (method, kwargs), tweet_id, response in zip(
+            calls, call_tweet_ids, responses
+        ):
+            if method == "post":
+                if not response or response[0] is None:
+                    continue
+                if tweet_id is None:
+                    new_tweets.append(
+                        {
+                            "tweet_id": response[0],
+                            "text": [kwargs["tweets"][0]["text"]],
+                            "timestamp": self.get_sync_timestamp(),
+                        }
+                    )
+                    continue
+            elif not response or not response["success"]:
                 continue
 
-            if action == "reply":
-                responded = yield from self.respond_tweet(tweet_id, text)
-                if responded:
-                    new_interacted_tweet_ids.append(tweet_id)
+            new_interacted_tweet_ids.append(tweet_id)
 
-            if action == "quote":
-                quoted = yield from self.respond_tweet(
-                    tweet_id, text, quote=True, user_name=user_name
-                )
-                if quoted:
-                    new_interacted_tweet_ids.append(tweet_id)
+        # Write the new tweets to the database
+        if new_tweets:
+            yield from self.store_tweet(new_tweets)
+            self.context.logger.info("Wrote latest tweets to db")
 
         return Event.DONE.value, new_interacted_tweet_ids
 
+    def _get_llm_decision(
+        self, prompt: str, cache_parts: Tuple[str, ...]
+    ) -> Generator[None, None, Optional[str]]:
+        """Get the LLM response for a prompt, reusing recent responses for the same inputs"""
+        key = hashlib.blake2b("\0".join(cache_parts).encode()).hexdigest()
+        now = self.get_sync_timestamp()
+
+        cached = self._llm_cache.get(key)
+        if cached is not None and now - cached[0] < LLM_CACHE_TTL:
+            self.context.logger.info("Reusing cached LLM response")
+            self._llm_cache.move_to_end(key)
+            return cached[1]
+
+        llm_response = yield from self._call_genai(prompt=prompt)
+        # Only keep responses the caller can act on, so a malformed answer is retried
+        if llm_response is None or not parse_json_from_llm(llm_response):
+            return llm_response
+
+        self._llm_cache[key] = (now, llm_response)
+        self._llm_cache.move_to_end(key)
+        if len(self._llm_cache) > LLM_CACHE_SIZE:
+            self._llm_cache.popitem(last=False)
+
+        return llm_response
+
 
 class ActionTweetBehaviour(BaseTweetBehaviour):  # pylint: disable=too-many-ancestors
     """ActionTweetBehaviour"""
@@ -460,19 +717,7 @@ class ActionTweetBehaviour(BaseTweetBehaviour):  # pylint: disable=too-many-ance
     def async_act(self) -> Generator:
         """Do the act, supporting asynchronous execution."""
 
-        with self.context.benchmark_tool.measure(self.behaviour_id).local():
-            event = yield from self.get_event()
-
-            payload = ActionTweetPayload(
-                sender=self.context.agent_address,
-                event=event,
-            )
-
-        with self.context.benchmark_tool.measure(self.behaviour_id).consensus():
-            yield from self.send_a2a_transaction(payload)
-            yield from self.wait_until_round_end()
-
-        self.set_done()
+        yield from self._run_act(ActionTweetPayload, event=self.get_event())
 
     def get_event(self) -> Generator[None, None, str]:
         """Get the next event"""
@@ -90,5 +90,6 @@ class Params(BaseParams):  # pylint: disable=too-many-instance-attributes
         )
         self.meme_subgraph_url = self._ensure("meme_subgraph_url", kwargs, str)
         self.skip_engagement = self._ensure("skip_engagement", kwargs, bool)
+        self.enable_benchmarks = self._ensure("enable_benchmarks", kwargs, bool)
 
         super().__init__(*args, **kwargs)
@@ -18,6 +18,7 @@
 # ------------------------------------------------------------------------------
 
 """Script for building the AEA responsible for running optimus."""
+import logging
 import os
 import sys
 from pathlib import Path
@@ -37,5 +38,23 @@ from aea_ledger_ethereum.ethereum import *
 from aea_ledger_cosmos.cosmos import *
 from aea.crypto.registries.base import *
 
+
+def install_uvloop() -> None:
+    """Use uvloop for the agent event loops if it is enabled and available."""
+    if os.environ.get("MEMEOOORR_USE_UVLOOP", "false").lower() != "true":
+        return
+    try:
+        import uvloop  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        # uvloop is not available on Windows
+        logging.getLogger(__name__).warning(
+            "MEMEOOORR_USE_UVLOOP is set but uvloop is not installed, "
+            "using the default asyncio event loop"
+        )
+        return
+    uvloop.install()
+
+
 if __name__ == "__main__":
+    install_uvloop()  # pragma: no cover
     cli(prog_name="aea")  # pragma: no cover